@@ -0,0 +1,129 @@
+"""
+Pure computation core for the energy simulator.
+
+No Streamlit imports here: the app layer applies its own caching on top,
+and these functions stay importable for scripts and benchmarks.
+"""
+import functools
+
+import numpy as np
+
+# -------------------------------
+# Constants
+# -------------------------------
+GRAVITY = 9.81  # m/s^2
+WATER_DENSITY = 1000  # kg/m^3
+HOURS_PER_YEAR = 24 * 365
+REPORT_SOURCES = ["Geothermal + Waste", "Waterfall Turbine"]
+
+# Folded constants: one multiply at import time instead of repeated
+# global lookups and divides on every call.
+HYDRO_KW_COEFF = WATER_DENSITY * GRAVITY / 1000.0  # kW per (m^3/s * m * efficiency)
+INV_CONSUMPTION = 1.0 / 7200.0  # households per kWh/year
+
+TURBINE_EFF_MAX = 0.95  # upper bound of the feasible turbine efficiency range
+AI_FRACTION_GRID = np.linspace(0.0, 1.0, 101)  # allocated once at import
+
+# Scenario presets: (mass_flow, delta_T, geothermal_eff)
+SCENARIO_PRESETS = {
+    "Small Well": (10, 150, 0.12),
+    "Large Well": (50, 200, 0.12),
+    "Extreme High Output": (100, 250, 0.15),
+}
+
+# -------------------------------
+# Functions
+# -------------------------------
+@functools.lru_cache(maxsize=1024)
+def geothermal_thermal_power(mass_flow, Cp, delta_T):
+    return mass_flow * Cp * delta_T  # kW
+
+@functools.lru_cache(maxsize=1024)
+def geothermal_electric_power(Qthermal, efficiency):
+    return Qthermal * efficiency
+
+@functools.lru_cache(maxsize=1024)
+def recovered_waste_power(E_input, wasted_fraction, AI_fraction):
+    return E_input * wasted_fraction * AI_fraction
+
+@functools.lru_cache(maxsize=1024)
+def waterfall_power(flow_rate, height, efficiency, _coeff=HYDRO_KW_COEFF):
+    # _coeff is bound as a default so CPython uses LOAD_FAST, not LOAD_GLOBAL
+    return _coeff * flow_rate * height * efficiency  # kW
+
+@functools.lru_cache(maxsize=1024)
+def annual_energy(power_kw):
+    return power_kw * HOURS_PER_YEAR
+
+@functools.lru_cache(maxsize=1024)
+def households_powered(Eyear, consumption_per_household=7200):
+    return Eyear / consumption_per_household
+
+def compute_all(params):
+    """
+    Fused per-rerun computation: evaluate every derived quantity from the ten
+    raw inputs in a single call instead of six chained scalar function calls.
+    Input order: [mass_flow, Cp, delta_T, geothermal_eff, E_input,
+    wasted_fraction, AI_fraction, flow_rate, height, turbine_eff].
+    """
+    (mass_flow, Cp, delta_T, geothermal_eff, E_input,
+     wasted_fraction, AI_fraction, flow_rate, height, turbine_eff) = params
+    Qthermal = mass_flow * Cp * delta_T
+    Pgeothermal = Qthermal * geothermal_eff
+    Pwaste = E_input * wasted_fraction * AI_fraction
+    powers = np.array([Pgeothermal + Pwaste,
+                       HYDRO_KW_COEFF * flow_rate * height * turbine_eff])
+    Eyear = powers * HOURS_PER_YEAR
+    households = Eyear * INV_CONSUMPTION
+    return np.concatenate(([Qthermal, Pgeothermal, Pwaste], powers, Eyear, households))
+
+def generate_report(Pgeo, Pwaste, Pwaterfall):
+    """
+    Per-source report columns as plain lists (order matches REPORT_SOURCES).
+    """
+    powers = [Pgeo + Pwaste, Pwaterfall]
+    annual = [p * HOURS_PER_YEAR for p in powers]
+    households = [e * INV_CONSUMPTION for e in annual]
+    return powers, annual, households
+
+def report_csv(powers, annual, households):
+    lines = ["Source,Power Output (kW),Annual Energy (kWh),Households Powered"]
+    for source, p, e, h in zip(REPORT_SOURCES, powers, annual, households):
+        lines.append(f"{source},{p},{e},{h}")
+    return "\n".join(lines) + "\n"
+
+def preset_power_grid(Cp=4.18, E_input=100, wasted_fraction=0.3):
+    """
+    Broadcast total geothermal power over (preset, AI fraction) in a single
+    NumPy expression so the UI can look results up instead of recomputing.
+    Returns (names, fractions, grid) with grid shape (n_presets, n_fractions).
+    """
+    names = list(SCENARIO_PRESETS)
+    presets = np.array([SCENARIO_PRESETS[name] for name in names])
+    base = presets[:, 0] * Cp * presets[:, 1] * presets[:, 2]
+    grid = base[:, None] + E_input * wasted_fraction * AI_FRACTION_GRID[None, :]
+    return names, AI_FRACTION_GRID, grid
+
+def optimize_ai_fraction(E_input, wasted_fraction, target_power):
+    """
+    Simulate AI optimization: calculate AI fraction needed to reach target power.
+    """
+    if wasted_fraction == 0:
+        return 0
+    return min(1.0, target_power / (E_input * wasted_fraction))
+
+def optimize_waste_fraction(E_input, wasted_fraction, Qthermal, geothermal_eff):
+    """
+    Closed form for (best_fraction, best_total_power): total power is linear
+    and increasing in the AI fraction, so the optimum on [0, 1] is the upper
+    bound — no sampling sweep needed.
+    """
+    return 1.0, Qthermal * geothermal_eff + E_input * wasted_fraction
+
+def optimize_turbine(flow_rate, height):
+    """
+    Closed form for (best_efficiency, best_power_kw): power is linear in
+    efficiency, so the optimum over the feasible range [0.60, 0.95] is the
+    upper bound.
+    """
+    return TURBINE_EFF_MAX, waterfall_power(flow_rate, height, TURBINE_EFF_MAX)